@@ -0,0 +1,91 @@
+# cython: language_level=3
+"""
+Optional Cython fast path for the per-line cleaning loop in test.py.
+
+Build in place (requires Cython):
+  python dataset/setup.py build_ext --inplace
+
+test.py falls back to the pure-Python process_lines() when this
+extension is not built, so building it is never required.
+"""
+
+from unicodedata import is_normalized, normalize
+
+
+cdef str _normalize(str s, bint normalize_unicode, bint strip_lines,
+                    bint collapse_whitespace, object ws_sub):
+    """Mirror of test.py:normalize_text with cfg flags unpacked."""
+    if strip_lines:
+        s = s.strip()
+    if normalize_unicode and not is_normalized("NFC", s):
+        s = normalize("NFC", s)
+    if collapse_whitespace:
+        s = ws_sub(" ", s).strip()
+    return s
+
+
+def process_lines_c(list lines, int min_chars, int ideal_min, int ideal_max,
+                    int review_min, int review_max, int hard_max,
+                    bint split_long, bint normalize_unicode, bint strip_lines,
+                    bint collapse_whitespace, object sent_re, object ws_re):
+    """
+    Chunk version of test.py:process_lines.
+
+    Takes one list of raw lines plus the unpacked CleanConfig fields and
+    returns the same (kept_sent, removed, cat) tuples as a list. Length
+    categorization runs on C ints, and regex work stays in the compiled
+    pattern objects passed in.
+    """
+    cdef list out = []
+    cdef list candidates
+    cdef Py_ssize_t n
+    cdef str raw, original, cleaned, sent, cat
+    ws_sub = ws_re.sub
+    sent_split = sent_re.split
+
+    for raw in lines:
+        original = raw.rstrip("\n")
+        cleaned = _normalize(original, normalize_unicode, strip_lines,
+                             collapse_whitespace, ws_sub)
+
+        if not cleaned:
+            out.append((None, ("empty", original), "empty"))
+            continue
+
+        candidates = [cleaned]
+        if split_long and len(cleaned) > ideal_max:
+            sents = [p.strip() for p in sent_split(cleaned) if p.strip()]
+            if sents:
+                candidates = sents
+
+        # Candidates are already normalized: `cleaned` went through
+        # _normalize and the split parts are stripped fragments of it.
+        for sent in candidates:
+            if not sent:
+                out.append((None, ("empty_after_split", original),
+                            "empty_after_split"))
+                continue
+
+            n = len(sent)
+            # Inlined categorize_len on C ints
+            if n < min_chars:
+                cat = "too_short"
+            elif ideal_min <= n <= ideal_max:
+                cat = "ideal"
+            elif n < ideal_min:
+                cat = "short_ok"
+            elif review_min <= n <= review_max:
+                cat = "very_long_review"
+            elif n > hard_max:
+                cat = "too_long"
+            else:
+                cat = "other"
+
+            if cat == "too_short":
+                out.append((None, ("too_short(<min_chars)", sent), cat))
+            elif cat == "too_long":
+                out.append((None, ("too_long(>hard_max)", sent), cat))
+            else:
+                out.append((sent, None, cat))
+
+    return out
@@ -0,0 +1,21 @@
+"""Build the optional _cleaner Cython extension for test.py.
+
+Usage (requires Cython):
+  python dataset/setup.py build_ext --inplace
+"""
+
+import os
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Build relative to this directory so --inplace drops the .so next to
+# _cleaner.pyx regardless of the caller's working directory.
+os.chdir(HERE)
+
+setup(
+    name="khmer_cleaner_ext",
+    ext_modules=cythonize("_cleaner.pyx", language_level=3),
+)
@@ -10,19 +10,37 @@ Usage:
   python khmer_clean_txt.py --input raw.txt --outdir out --split-long
 """
 
-from __future__ import annotations
 import argparse
+import functools
+import itertools
 import json
 import os
 import re
 import unicodedata
 from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
+# Optional Rust JSON encoder for the stats report; stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from dataclasses import dataclass, asdict
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 
 # --- Khmer sentence boundary punctuation (extend if needed)
 SENT_BOUNDARY_RE = re.compile(r"(?<=[។?!])\s*")  # split after ។ ? !
+_WS_RE = re.compile(r"\s+")
+
+# Optional Cython fast path (see _cleaner.pyx); built via:
+#   python dataset/setup.py build_ext --inplace
+try:
+    from _cleaner import process_lines_c
+except ImportError:
+    process_lines_c = None
 
 
 @dataclass
@@ -46,11 +64,14 @@ def normalize_text(s: str, cfg: CleanConfig) -> str:
 
     if cfg.normalize_unicode:
         # NFC is usually safe; NFKC can change some characters, so avoid unless needed.
-        s = unicodedata.normalize("NFC", s)
+        # Quick-check first: most Khmer dumps are already NFC, and the check is
+        # far cheaper than an unconditional normalize + reallocation.
+        if not unicodedata.is_normalized("NFC", s):
+            s = unicodedata.normalize("NFC", s)
 
     if cfg.collapse_whitespace:
         # Collapse internal whitespace to single spaces
-        s = re.sub(r"\s+", " ", s).strip()
+        s = _WS_RE.sub(" ", s).strip()
 
     return s
 
@@ -82,17 +103,27 @@ def categorize_len(n: int, cfg: CleanConfig) -> str:
 
 
 def process_lines(
-    lines: List[str], cfg: CleanConfig
-) -> Tuple[List[str], List[Tuple[str, str]], Counter]:
+    lines: Iterable[str], cfg: CleanConfig
+) -> Iterator[Tuple[Optional[str], Optional[Tuple[str, str]], str]]:
     """
-    Returns:
-      kept_lines: cleaned lines that pass filters (and optional splitting)
-      removed: list of tuples (reason, original_line)
-      stats: Counter with length category counts
+    Stream cleaning results one candidate sentence at a time.
+
+    Accepts any iterable of raw lines (e.g. an open file object) so the
+    whole corpus never has to be materialized in memory.
+
+    Yields tuples of:
+      kept_sent: cleaned sentence that passes filters, or None if dropped
+      removed: (reason, line) tuple when the candidate is dropped, else None
+      cat: length category label for stats
     """
-    kept: List[str] = []
-    removed: List[Tuple[str, str]] = []
-    stats = Counter()
+    # Precompute the category per length once: plain list indexing in the
+    # loop replaces categorize_len's branch chain and cfg attribute reads.
+    # Anything past the table is unconditionally "too_long". This is the
+    # full partial evaluation of the run's thresholds — stronger than
+    # codegen'ing a specialized compare chain, which would still pay a
+    # function call and branches per candidate.
+    top = max(cfg.min_chars, cfg.ideal_min, cfg.ideal_max, cfg.review_max, cfg.hard_max) + 1
+    cats = [categorize_len(i, cfg) for i in range(top + 1)]
 
     for raw in lines:
         original = raw.rstrip("\n")
@@ -100,8 +131,7 @@ def process_lines(
 
         # Skip empty lines
         if not cleaned:
-            removed.append(("empty", original))
-            stats["empty"] += 1
+            yield None, ("empty", original), "empty"
             continue
 
         # Optional: split long lines into sentences
@@ -111,47 +141,69 @@ def process_lines(
             if sents:
                 candidates = sents
 
-        # Evaluate each candidate sentence
+        # Evaluate each candidate sentence. No re-normalization needed:
+        # `cleaned` is already normalized and split_into_sentences only
+        # splits and strips, never introducing new whitespace.
         for sent in candidates:
-            sent = normalize_text(sent, cfg)
             if not sent:
-                removed.append(("empty_after_split", original))
-                stats["empty_after_split"] += 1
+                yield None, ("empty_after_split", original), "empty_after_split"
                 continue
 
             n = len(sent)
-            cat = categorize_len(n, cfg)
-            stats[cat] += 1
+            cat = cats[n] if n <= top else "too_long"
 
             if cat == "too_short":
-                removed.append(("too_short(<min_chars)", sent))
+                yield None, ("too_short(<min_chars)", sent), cat
             elif cat == "too_long":
-                removed.append(("too_long(>hard_max)", sent))
+                yield None, ("too_long(>hard_max)", sent), cat
             else:
                 # Keep: includes ideal, short_ok, very_long_review
-                kept.append(sent)
+                yield sent, None, cat
+
 
-    return kept, removed, stats
+_CHUNK_LINES = 65536
 
 
-def percentile(sorted_vals: List[int], p: float) -> int:
-    """Simple percentile (p in [0,100])."""
-    if not sorted_vals:
-        return 0
-    k = (len(sorted_vals) - 1) * (p / 100.0)
-    f = int(k)
-    c = min(f + 1, len(sorted_vals) - 1)
-    if f == c:
-        return sorted_vals[f]
-    d0 = sorted_vals[f] * (c - k)
-    d1 = sorted_vals[c] * (k - f)
-    return int(round(d0 + d1))
+def iter_results(
+    lines: Iterable[str], cfg: CleanConfig
+) -> Iterator[Tuple[Optional[str], Optional[Tuple[str, str]], str]]:
+    """
+    Yield cleaning results, using the Cython extension in bounded chunks
+    when it is built and the pure-Python process_lines otherwise.
+    """
+    if process_lines_c is None:
+        yield from process_lines(lines, cfg)
+        return
+
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, _CHUNK_LINES))
+        if not chunk:
+            return
+        yield from process_lines_c(
+            chunk,
+            cfg.min_chars, cfg.ideal_min, cfg.ideal_max,
+            cfg.review_min, cfg.review_max, cfg.hard_max,
+            cfg.split_long, cfg.normalize_unicode, cfg.strip_lines,
+            cfg.collapse_whitespace, SENT_BOUNDARY_RE, _WS_RE,
+        )
+
+
+def _process_chunk(
+    chunk: List[str], cfg: CleanConfig
+) -> List[Tuple[Optional[str], Optional[Tuple[str, str]], str]]:
+    """Pool worker: clean one chunk of raw lines (cross-line state — dedup
+    and stats — stays in the parent, so chunks are independent)."""
+    return list(iter_results(chunk, cfg))
 
 
 def write_list(path: str, lines: List[str]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        for ln in lines:
-            f.write(ln + "\n")
+    # Join in 64k-line blocks: one write call per block instead of a
+    # per-line concat + write, without building one giant string.
+    with open(path, "w", encoding="utf-8", buffering=1 << 20, newline="\n") as f:
+        for i in range(0, len(lines), _CHUNK_LINES):
+            f.write("\n".join(lines[i : i + _CHUNK_LINES]))
+            f.write("\n")
 
 
 def main() -> None:
@@ -163,6 +215,10 @@ def main() -> None:
     ap.add_argument("--ideal-max", type=int, default=200)
     ap.add_argument("--hard-max", type=int, default=300)
     ap.add_argument("--split-long", action="store_true", help="Split long lines into sentences")
+    ap.add_argument(
+        "--jobs", type=int, default=None,
+        help="Worker processes for cleaning (default: all cores; 1 = in-process)",
+    )
     args = ap.parse_args()
 
     cfg = CleanConfig(
@@ -178,58 +234,129 @@ def main() -> None:
 
     os.makedirs(args.outdir, exist_ok=True)
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        raw_lines = f.readlines()
-
-    kept, removed, stats = process_lines(raw_lines, cfg)
-
-    # De-duplicate while preserving order (optional but often helpful)
-    seen = set()
-    kept_dedup = []
-    for ln in kept:
-        if ln not in seen:
-            seen.add(ln)
-            kept_dedup.append(ln)
-
-    # Save outputs
+    # Output paths
     cleaned_path = os.path.join(args.outdir, "cleaned.txt")
     removed_path = os.path.join(args.outdir, "removed.txt")
     stats_path = os.path.join(args.outdir, "stats.json")
 
-    write_list(cleaned_path, kept_dedup)
-
-    with open(removed_path, "w", encoding="utf-8") as f:
-        for reason, ln in removed:
-            f.write(f"[{reason}] {ln}\n")
-
-    # Extra numeric stats
-    lengths = [len(x) for x in kept_dedup]
-    lengths_sorted = sorted(lengths)
+    input_lines = 0
+
+    def counted(fobj: Iterable[str]) -> Iterator[str]:
+        nonlocal input_lines
+        for line in fobj:
+            input_lines += 1
+            yield line
+
+    def chunks(fobj: Iterable[str]) -> Iterator[List[str]]:
+        it = counted(fobj)
+        while True:
+            chunk = list(itertools.islice(it, _CHUNK_LINES))
+            if not chunk:
+                return
+            yield chunk
+
+    # De-duplicate while preserving order (optional but often helpful);
+    # dedup + writing happen as lines are produced so memory stays bounded.
+    # The set cannot be pre-sized: the kept-line count isn't known up front
+    # in a streaming pass and CPython offers no capacity hint for sets, so
+    # resize cost stays amortized O(1) per insert.
+    seen = set()
+    removed_count = 0
+    removed_buf: List[str] = []
+    lengths: List[int] = []
+    stats = Counter()
+    # Category labels are buffered and folded into the Counter in batches:
+    # Counter.update(iterable) counts in C, versus two dict probes per item
+    # for stats[cat] += 1 in the hot loop.
+    cats_buf: List[str] = []
+    cats_append = cats_buf.append
+
+    pool = None
+    with open(args.input, "r", encoding="utf-8", buffering=1 << 20) as f, open(
+        cleaned_path, "w", encoding="utf-8", buffering=1 << 20
+    ) as fc, open(removed_path, "w", encoding="utf-8", buffering=1 << 20) as fr:
+        if args.jobs == 1:
+            results = iter_results(counted(f), cfg)
+        else:
+            # Per-line cleaning is embarrassingly parallel; fan chunks out to
+            # worker processes. imap (ordered) keeps the output deterministic.
+            pool = Pool(args.jobs)
+            worker = functools.partial(_process_chunk, cfg=cfg)
+            results = itertools.chain.from_iterable(pool.imap(worker, chunks(f)))
+
+        try:
+            for sent, removed, cat in results:
+                cats_append(cat)
+                if len(cats_buf) >= _CHUNK_LINES:
+                    stats.update(cats_buf)
+                    cats_buf.clear()
+                if removed is not None:
+                    reason, ln = removed
+                    # Buffer formatted records and flush as one joined block:
+                    # one write call per 64k records instead of one per record.
+                    removed_buf.append(f"[{reason}] {ln}")
+                    if len(removed_buf) >= _CHUNK_LINES:
+                        fr.write("\n".join(removed_buf))
+                        fr.write("\n")
+                        removed_buf.clear()
+                    removed_count += 1
+                if sent is not None:
+                    # Single hash probe: add() and compare sizes instead of a
+                    # membership test followed by a second probe in add().
+                    n_seen = len(seen)
+                    seen.add(sent)
+                    if len(seen) != n_seen:
+                        fc.write(sent + "\n")
+                        lengths.append(len(sent))
+            if removed_buf:
+                fr.write("\n".join(removed_buf))
+                fr.write("\n")
+                removed_buf.clear()
+            if cats_buf:
+                stats.update(cats_buf)
+                cats_buf.clear()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    # Extra numeric stats (vectorized; avoids a Python-level sort + loop)
+    arr = np.fromiter(lengths, dtype=np.int32, count=len(lengths))
+    if arr.size:
+        p50, p90, p95 = np.percentile(arr, [50, 90, 95]).round().astype(int).tolist()
+        length_summary = {
+            "min": int(arr.min()),
+            "max": int(arr.max()),
+            "p50": p50,
+            "p90": p90,
+            "p95": p95,
+            "mean": float(arr.mean()),
+        }
+    else:
+        length_summary = {"min": 0, "max": 0, "p50": 0, "p90": 0, "p95": 0, "mean": 0.0}
 
     report = {
         "config": asdict(cfg),
-        "input_lines": len(raw_lines),
-        "kept_lines": len(kept_dedup),
-        "removed_items": len(removed),
+        "input_lines": input_lines,
+        "kept_lines": len(lengths),
+        "removed_items": removed_count,
         "length_categories": dict(stats),
-        "kept_length_summary": {
-            "min": min(lengths) if lengths else 0,
-            "max": max(lengths) if lengths else 0,
-            "p50": percentile(lengths_sorted, 50),
-            "p90": percentile(lengths_sorted, 90),
-            "p95": percentile(lengths_sorted, 95),
-            "mean": (sum(lengths) / len(lengths)) if lengths else 0.0,
-        },
+        "kept_length_summary": length_summary,
     }
 
-    with open(stats_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        # orjson emits UTF-8 bytes directly, hence the binary mode
+        with open(stats_path, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    else:
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
 
     print("Done.")
     print(f"Cleaned:  {cleaned_path}")
     print(f"Removed:  {removed_path}")
     print(f"Stats:    {stats_path}")
-    print(f"Kept lines: {len(kept_dedup)} / {len(raw_lines)}")
+    print(f"Kept lines: {len(lengths)} / {input_lines}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
+import asyncio
+import itertools
+import os
+from collections import Counter
+
 import torch
 import torch.nn as nn
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence, pad_sequence
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
@@ -14,11 +20,26 @@ from transformers import AutoTokenizer
 TOKENIZER_DIR = r"D:\AMS_Year5\Semester_1\TP_IWR\Khmer-Text-Prediction\Trained_Model\BiLSTM\km-tokenizer-khmer"
 MODEL_PATH    = r"D:\AMS_Year5\Semester_1\TP_IWR\Khmer-Text-Prediction\Trained_Model\BiLSTM\bilstm_khmer.pth"
 
+# Corpus used to seed first-keystroke suggestions (optional; see
+# load_top_unigrams)
+UNIGRAM_CORPUS = os.path.join(
+    os.path.dirname(__file__), "..", "dataset", "cleaned_txt", "clean_khmer.txt"
+)
+
 EMBED_SIZE  = 256
 HIDDEN_SIZE = 512
 NUM_LAYERS  = 2
 TOP_K       = 5
 
+# Only the trailing context influences next-token prediction on a keyboard;
+# capping it bounds per-keystroke latency regardless of how much was typed.
+MAX_CONTEXT = 128
+
+# Micro-batching: concurrent /suggest requests arriving within MAX_WAIT_MS
+# are padded together and run as one forward pass.
+MAX_BATCH   = 32
+MAX_WAIT_MS = 5.0
+
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="views")
@@ -33,6 +54,39 @@ if tokenizer.pad_token_id is None:
 PAD_ID = tokenizer.pad_token_id
 VOCAB_SIZE = tokenizer.vocab_size
 
+# Decode every vocabulary id once at startup; suggestion lookups then cost a
+# list index instead of a SentencePiece decode per token per request.
+ID_TO_STR = [tokenizer.decode([i]).strip() for i in range(VOCAB_SIZE)]
+
+SPECIAL_IDS = set(tokenizer.all_special_ids)
+
+
+def load_top_unigrams(path: str, top_k: int = TOP_K, max_lines: int = 20000):
+    """Most frequent corpus tokens; served when there is no usable context
+    (first keystroke) so the model never runs for that request shape."""
+    counts = Counter()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in itertools.islice(f, max_lines):
+                counts.update(tokenizer.encode(line.strip(), add_special_tokens=False))
+    except OSError:
+        return []
+
+    top = []
+    seen = set()
+    for tid, _ in counts.most_common():
+        tok = ID_TO_STR[tid]
+        if tid in SPECIAL_IDS or not tok or tok in seen:
+            continue
+        seen.add(tok)
+        top.append(tok)
+        if len(top) >= top_k:
+            break
+    return top
+
+
+TOP_UNIGRAMS = load_top_unigrams(UNIGRAM_CORPUS)
+
 # ---------------------------
 # BiLSTM model (must match training)
 # ---------------------------
@@ -47,13 +101,31 @@ class BiLSTM(nn.Module):
         )
         self.fc = nn.Linear(HIDDEN_SIZE * 2, VOCAB_SIZE)
 
-    def forward(self, x):
-        x = self.embedding(x)
-        out, _ = self.lstm(x)
-        logits = self.fc(out[:, -1, :])
+    def forward(self, x, lengths=None):
+        emb = self.embedding(x)
+        if lengths is None:
+            out, _ = self.lstm(emb)
+            last = out[:, -1, :]
+        else:
+            # Padded batch: pack so the LSTM (incl. backward direction)
+            # never sees pad tokens, then gather each row's true last step.
+            packed = pack_padded_sequence(
+                emb, lengths.cpu(), batch_first=True, enforce_sorted=False
+            )
+            out, _ = self.lstm(packed)
+            out, _ = pad_packed_sequence(out, batch_first=True)
+            idx = (lengths - 1).clamp(min=0).view(-1, 1, 1).expand(-1, 1, out.size(2))
+            last = out.gather(1, idx).squeeze(1)
+        logits = self.fc(last)
         return logits
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
+
+# Inference-only server: let cuDNN autotune its LSTM algorithm for the
+# shapes we feed it instead of always taking the generic deterministic path.
+torch.backends.cudnn.benchmark = True
+torch.backends.cudnn.deterministic = False
+
 model = BiLSTM().to(device)
 
 state = torch.load(MODEL_PATH, map_location=device)
@@ -62,30 +134,119 @@ if isinstance(state, dict) and "model_state_dict" in state:
 model.load_state_dict(state, strict=True)
 model.eval()
 
-@torch.no_grad()
-def suggest(text: str, top_k: int = TOP_K):
+# Inference-only precision: FP16 on GPU (tensor cores), dynamic int8 on CPU
+# (quantized MatMul/LSTM kernels). Logits are cast back to FP32 in run_batch.
+if device == "cuda":
+    model = model.half()
+    # Re-compact the LSTM weights after load + dtype conversion so cuDNN
+    # reads them from one contiguous block.
+    model.lstm.flatten_parameters()
+else:
+    model = torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear, nn.LSTM}, dtype=torch.qint8
+    )
+
+@torch.inference_mode()
+def run_batch(batch_ids, top_k: int = TOP_K):
+    """Run one forward pass over a batch of id sequences; returns one
+    suggestion list per sequence."""
+    lengths = torch.tensor([len(ids) for ids in batch_ids], dtype=torch.long, device=device)
+    x = pad_sequence(
+        [torch.tensor(ids, dtype=torch.long) for ids in batch_ids],
+        batch_first=True, padding_value=PAD_ID,
+    ).to(device)
+    logits = model(x, lengths).float()
+    probs = torch.softmax(logits, dim=-1)
+    top_ids = torch.topk(probs, k=top_k, dim=-1).indices.tolist()
+
+    results = []
+    for row in top_ids:
+        suggestions = []
+        seen = set()
+        for tid in row:
+            tok = ID_TO_STR[tid]
+            if tok and tok not in seen:
+                seen.add(tok)
+                suggestions.append(tok)
+        results.append(suggestions[:top_k])
+    return results
+
+
+# ---------------------------
+# Micro-batching queue
+# ---------------------------
+request_queue: asyncio.Queue = asyncio.Queue()
+
+
+async def batch_worker():
+    """Drain queued requests into padded batches and fan results back out."""
+    loop = asyncio.get_running_loop()
+    while True:
+        ids, fut = await request_queue.get()
+        batch = [(ids, fut)]
+
+        # Collect whatever else arrives within the batching window
+        deadline = loop.time() + MAX_WAIT_MS / 1000.0
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(request_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+
+        try:
+            results = await loop.run_in_executor(
+                None, run_batch, [ids for ids, _ in batch]
+            )
+        except Exception as exc:  # surface model errors to the waiting requests
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            continue
+
+        for (_, fut), suggestions in zip(batch, results):
+            if not fut.done():
+                fut.set_result(suggestions)
+
+
+@app.on_event("startup")
+async def start_batch_worker():
+    asyncio.create_task(batch_worker())
+
+
+# Users retype the same prefixes constantly; remember recent results.
+suggest_cache: dict = {}
+SUGGEST_CACHE_SIZE = 4096
+
+
+async def suggest(text: str):
     text = text or ""
     if not text.strip():
-        return []
+        return TOP_UNIGRAMS[:TOP_K]
 
     ids = tokenizer.encode(text, add_special_tokens=False)
-    if len(ids) == 0:
-        return []
+    # No usable context (nothing encoded, or only pad/unk/special ids):
+    # serve the precomputed unigram list instead of running the model.
+    if len(ids) == 0 or all(i in SPECIAL_IDS or i == PAD_ID for i in ids):
+        return TOP_UNIGRAMS[:TOP_K]
+    ids = ids[-MAX_CONTEXT:]
 
-    x = torch.tensor([ids], dtype=torch.long, device=device)
-    logits = model(x)
-    probs = torch.softmax(logits, dim=-1)
-    top_ids = torch.topk(probs, k=top_k, dim=-1).indices[0].tolist()
+    key = tuple(ids)
+    cached = suggest_cache.get(key)
+    if cached is not None:
+        return cached
 
-    suggestions = []
-    seen = set()
-    for tid in top_ids:
-        tok = tokenizer.decode([tid]).strip()
-        if tok and tok not in seen:
-            seen.add(tok)
-            suggestions.append(tok)
+    fut = asyncio.get_running_loop().create_future()
+    await request_queue.put((ids, fut))
+    suggestions = await fut
 
-    return suggestions[:top_k]
+    if len(suggest_cache) >= SUGGEST_CACHE_SIZE:
+        suggest_cache.clear()
+    suggest_cache[key] = suggestions
+    return suggestions
 
 # ---------------------------
 # API schema
@@ -98,5 +259,5 @@ def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.post("/suggest")
-def suggest_api(payload: SuggestRequest):
-    return {"suggestions": suggest(payload.text)}
+async def suggest_api(payload: SuggestRequest):
+    return {"suggestions": await suggest(payload.text)}
